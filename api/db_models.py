@@ -18,7 +18,24 @@ SQLALCHEMY_DATABASE_URL = (
 # SQLAlchemy setup
 # Note: FastAPI recommends async database access, but for simplicity in this template,
 # we are using synchronous connection with a thread pool.
-engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
+# SQLAlchemy 2.x already sends executemany INSERTs as paged multi-row VALUES lists
+# ("insertmanyvalues"); insertmanyvalues_page_size sets the rows per statement.
+# "values_plus_batch" only adds psycopg2's execute_batch for executemany UPDATE/DELETE.
+# Connections are recycled on a timer rather than pinged on every checkout, which
+# saves a round-trip per use. The pool is per uvicorn worker, so keep it modest.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=False,
+    executemany_mode="values_plus_batch",
+    insertmanyvalues_page_size=1000,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -43,7 +60,7 @@ class PredictionLog(Base):
     target = Column(Integer, nullable=True) 
     
     # Metadata
-    prediction_time = Column(DateTime, default=func.now())
+    prediction_time = Column(DateTime, server_default=func.now())
     model_version = Column(String(50), default="v1.0")
 
 class MonitoringMetric(Base):
@@ -54,7 +71,7 @@ class MonitoringMetric(Base):
     __tablename__ = "monitoring_metrics"
 
     id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=func.now())
+    timestamp = Column(DateTime, server_default=func.now())
     data_drift_score = Column(Float, nullable=False)
     num_drifted_features = Column(Integer, nullable=False)
     metric_name = Column(String(100), nullable=False)
@@ -1,18 +1,109 @@
 import os
+import asyncio
 import joblib
-import pandas as pd
+import orjson
+import numpy as np
+from contextlib import asynccontextmanager
+from datetime import datetime
 from typing import Optional
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sqlalchemy import insert
 from sqlalchemy.exc import SQLAlchemyError
-from db_models import PredictionLog, get_db  # Import models and DB utility
+from db_models import PredictionLog, engine  # Import models and DB engine
+
+# --- Prediction and Log Batching ---
+# /predict enqueues its features; a background task scores everything queued at once
+# with a single vectorized call and resolves each request's future.
+PREDICT_BATCH_SIZE = int(os.environ.get("PREDICT_BATCH_SIZE", 128))
+PREDICT_TIMEOUT = float(os.environ.get("PREDICT_TIMEOUT", 5))  # seconds
+predict_queue: asyncio.Queue = asyncio.Queue()
+
+# /predict enqueues log rows; a background task flushes them in one multi-row INSERT
+LOG_BATCH_SIZE = int(os.environ.get("LOG_BATCH_SIZE", 200))
+LOG_FLUSH_INTERVAL = float(os.environ.get("LOG_FLUSH_INTERVAL", 0.1))  # seconds
+# Bounded so a stalled database costs dropped log rows rather than unbounded memory
+LOG_QUEUE_MAXSIZE = int(os.environ.get("LOG_QUEUE_MAXSIZE", 10000))
+log_queue: asyncio.Queue = asyncio.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+dropped_log_rows = 0
+
+def enqueue_prediction_log(row: dict) -> None:
+    """Queues a row for the batched writer, dropping (and counting) it when the queue is full."""
+    global dropped_log_rows
+    try:
+        log_queue.put_nowait(row)
+    except asyncio.QueueFull:
+        dropped_log_rows += 1
+        if dropped_log_rows % 1000 == 1:
+            print(f"Prediction log queue full; dropped {dropped_log_rows} rows so far.")
+
+def write_prediction_logs(rows: list) -> None:
+    """Inserts a batch of prediction log rows in a single transaction."""
+    try:
+        with engine.begin() as conn:
+            conn.execute(insert(PredictionLog), rows)
+        print(f"Logged {len(rows)} predictions to DB.")
+    except SQLAlchemyError as e:
+        print(f"Failed to log {len(rows)} predictions to database: {e}")
+
+async def prediction_log_writer():
+    """Drains up to LOG_BATCH_SIZE rows or LOG_FLUSH_INTERVAL seconds per flush.
+
+    A ``None`` item on the queue flushes the pending rows and stops the writer.
+    """
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        item = await log_queue.get()
+        if item is None:
+            break
+        rows = [item]
+        deadline = loop.time() + LOG_FLUSH_INTERVAL
+        while len(rows) < LOG_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(log_queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                stopping = True
+                break
+            rows.append(item)
+        # The engine is synchronous; keep the blocking INSERT off the event loop.
+        # Any failure only loses this batch; the writer must keep draining the queue.
+        try:
+            await asyncio.to_thread(write_prediction_logs, rows)
+        except Exception as e:
+            print(f"Failed to log {len(rows)} predictions to database: {e}")
+
+def log_task_failure(task: asyncio.Task) -> None:
+    """Done-callback that reports a background task ending on an exception."""
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Background task {task.get_name()} failed: {task.exception()!r}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scorer = asyncio.create_task(prediction_scorer(), name="prediction_scorer")
+    writer = asyncio.create_task(prediction_log_writer(), name="prediction_log_writer")
+    scorer.add_done_callback(log_task_failure)
+    writer.add_done_callback(log_task_failure)
+    yield
+    # Answer and flush anything still queued before the worker exits
+    await predict_queue.put(None)
+    await scorer
+    await log_queue.put(None)
+    await writer
 
 # --- FastAPI Initialization ---
 app = FastAPI(
     title="MLOps Prediction API",
     description="Serves predictions from the deployed ML model and logs requests.",
-    version="v1.0.0"
+    version="v1.0.0",
+    lifespan=lifespan
 )
 
 # --- Model Loading ---
@@ -30,6 +121,78 @@ except Exception as e:
     print(f"Error loading model: {e}")
     model = None
 
+def strip_feature_names(estimator) -> None:
+    """Drops the fitted feature names so raw arrays are scored without a warning.
+
+    /predict scores raw (n, 2) float arrays; models fit on a DataFrame would
+    otherwise warn about missing feature names on every call. On a Pipeline the
+    attribute is a read-only property forwarding to the first step, so strip it there.
+    """
+    if isinstance(estimator, Pipeline):
+        estimator = estimator.steps[0][1]
+    if "feature_names_in_" in vars(estimator):
+        del estimator.feature_names_in_
+
+# Kept outside the load try so a failure here can never discard a valid model
+if model is not None:
+    try:
+        strip_feature_names(model)
+    except Exception as e:
+        print(f"Could not strip feature names from model: {e}")
+
+# A binary LogisticRegression on the two features is a single dot product, so cache
+# its weights and skip sklearn's per-call validation and dispatch.
+_coef = None
+_intercept = 0.0
+_classes = None
+# Integer labels only, so other label types fall back to model.predict.
+if (
+    isinstance(model, LogisticRegression)
+    and model.coef_.shape == (1, 2)
+    and np.issubdtype(model.classes_.dtype, np.integer)
+):
+    _coef = model.coef_[0].astype(np.float64)
+    _intercept = float(model.intercept_[0])
+    _classes = model.classes_.astype(np.int64)
+
+def predict_batch(features: np.ndarray) -> list:
+    """Predicts the classes of an (n, 2) feature array, via the cached weights when available."""
+    if _coef is not None:
+        return _classes[(features @ _coef + _intercept > 0.0).astype(np.intp)].tolist()
+    return model.predict(features).astype(np.int64).tolist()
+
+async def prediction_scorer():
+    """Scores every request queued since the last pass in one predict_batch call.
+
+    Requests pile up while the loop is busy, so batches grow with load without
+    waiting on a timer. A ``None`` item on the queue stops the scorer.
+    """
+    stopping = False
+    while not stopping:
+        item = await predict_queue.get()
+        if item is None:
+            break
+        batch = [item]
+        while len(batch) < PREDICT_BATCH_SIZE and not predict_queue.empty():
+            item = predict_queue.get_nowait()
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+
+        features = np.array([(f1, f2) for f1, f2, _ in batch], dtype=np.float64)
+        try:
+            predictions = predict_batch(features)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        for (_, _, future), prediction in zip(batch, predictions):
+            # The client may have disconnected and cancelled its future
+            if not future.done():
+                future.set_result(prediction)
+
 # --- Pydantic Schemas ---
 
 class PredictionRequest(BaseModel):
@@ -42,31 +205,33 @@ class PredictionResponse(BaseModel):
 
 # --- API Endpoints ---
 
+# Probe bodies only depend on the model load state, which is fixed at import time,
+# so serialize them once instead of on every Docker/K8s health check.
+STATUS_BODY = orjson.dumps({"status": "healthy", "model_version": MODEL_VERSION})
+HEALTH_BODY = orjson.dumps({
+    "status": "ok",
+    "service": "MLOps Prediction API",
+    "model_loaded": model is not None,
+    "version": MODEL_VERSION
+})
+
 @app.get("/status")
 async def get_status():
-    return {"status": "healthy", "model_version": MODEL_VERSION}
+    return Response(content=STATUS_BODY, media_type="application/json")
 
 @app.get("/")
 async def health_check():
-    return {
-        "status": "ok",
-        "service": "MLOps Prediction API",
-        "model_loaded": model is not None,
-        "version": MODEL_VERSION
-    }
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 @app.post("/predict", response_model=PredictionResponse)
-async def predict_and_log(
-    request: PredictionRequest,
-    db: Session = Depends(get_db)
-):
-    # 1. Prepare input data
-    data_df = pd.DataFrame([request.model_dump()])
-
-    # 2. Generate prediction
+async def predict_and_log(request: PredictionRequest):
+    # 1. Generate prediction (scored together with any concurrently queued requests)
     if model:
+        future = asyncio.get_running_loop().create_future()
+        predict_queue.put_nowait((request.feature_1, request.feature_2, future))
         try:
-            prediction_result = int(model.predict(data_df)[0])
+            # Bounded so a dead or missing scorer surfaces as a 500 instead of a hang
+            prediction_result = await asyncio.wait_for(future, PREDICT_TIMEOUT)
         except Exception as e:
             print(f"Error during model prediction: {e}")
             raise HTTPException(status_code=500, detail="Internal Model Prediction Error.")
@@ -74,23 +239,17 @@ async def predict_and_log(
         print("Using placeholder prediction (model not loaded).")
         prediction_result = 0
 
-    # 3. Log prediction to DB
-    try:
-        new_log = PredictionLog(
-            feature_1=request.feature_1,
-            feature_2=request.feature_2,
-            prediction=prediction_result,
-            model_version=MODEL_VERSION
-        )
-        db.add(new_log)
-        db.commit()
-        db.refresh(new_log)
-        print(f"Prediction logged to DB: ID {new_log.id}, Result {prediction_result}")
-    except SQLAlchemyError as e:
-        db.rollback()
-        print(f"Failed to log prediction to database: {e}")
+    # 2. Queue prediction for the batched DB writer
+    enqueue_prediction_log({
+        # Request time, not flush time: the DB default would stamp a whole batch alike
+        "prediction_time": datetime.now(),
+        "feature_1": request.feature_1,
+        "feature_2": request.feature_2,
+        "prediction": prediction_result,
+        "model_version": MODEL_VERSION
+    })
 
-    # 4. Return response
+    # 3. Return response
     return PredictionResponse(
         prediction=prediction_result,
         model_version=MODEL_VERSION
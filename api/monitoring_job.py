@@ -1,76 +1,106 @@
 import os
 import time
+import functools
+from typing import Tuple
 import pandas as pd
 import json
+import connectorx as cx
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import exc, text
+from sqlalchemy import insert
 from evidently.report import Report
 from evidently.metric_preset import DataDriftPreset, DataQualityPreset
 from evidently import ColumnMapping
 import requests
 
 # Import database models and utilities from the API service
-from db_models import PredictionLog, MonitoringMetric, SessionLocal, engine, Base, get_db
+from db_models import MonitoringMetric, SessionLocal, SQLALCHEMY_DATABASE_URL
 
 # --- Configuration ---
 # Reference data path can be set via environment variable; default to /data/reference_data.csv
 REFERENCE_DATA_PATH = os.environ.get("REFERENCE_DATA_PATH", "/data/reference_data.csv")
+# Parquet copy written alongside the CSV by model_prep.py; preferred when present
+REFERENCE_PARQUET_PATH = os.path.splitext(REFERENCE_DATA_PATH)[0] + ".parquet"
 MODEL_VERSION = os.environ.get("MODEL_VERSION", "v1.0")
 BATCH_HOURS = int(os.environ.get("BATCH_HOURS", 24))  # Look back 24 hours by default
 SLACK_WEBHOOK_URL = os.environ.get("SLACK_WEBHOOK_URL", "")
 DRIFT_THRESHOLD = float(os.environ.get("DRIFT_THRESHOLD", 0))
+# Cap on rows pulled into memory for the drift report; larger windows are sampled
+MONITORING_SAMPLE_SIZE = int(os.environ.get("MONITORING_SAMPLE_SIZE", 20000))
 
-def fetch_data_from_db(db: Session, lookback_hours: int = 24) -> pd.DataFrame:
-    """Fetches recent production data from the prediction_logs table."""
+# Slack posts run on a background thread so a slow or unreachable webhook never
+# holds the DB session open; the worker is joined at interpreter exit.
+alert_executor = ThreadPoolExecutor(max_workers=1)
+
+def fetch_data_from_db(lookback_hours: int = 24) -> Tuple[pd.DataFrame, int, datetime, datetime]:
+    """Fetches recent production data from the prediction_logs table.
+
+    Windows larger than MONITORING_SAMPLE_SIZE are uniformly sampled server-side,
+    so memory stays bounded regardless of traffic. Returns the (sampled) frame, the
+    total number of rows in the window, and the window's start and end times.
+    """
     end_time = datetime.now()
     start_time = end_time - timedelta(hours=lookback_hours)
 
     print(f"Fetching production data from {start_time} to {end_time}")
 
     try:
-        query = text("""
-            SELECT feature_1, feature_2, prediction, target, prediction_time
+        # connectorx reads the result set column-wise via Arrow instead of boxing
+        # every value through the DBAPI cursor. The bounds are generated here, not
+        # user input, so inlining them is safe.
+        # Only the feature columns the drift report compares against the reference set.
+        # COUNT(*) OVER () is evaluated before LIMIT, so it carries the full window size.
+        query = f"""
+            SELECT feature_1, feature_2, COUNT(*) OVER () AS rows_total
             FROM prediction_logs
-            WHERE prediction_time BETWEEN :start_time AND :end_time
-        """)
-        df = pd.read_sql(query, engine, params={'start_time': start_time, 'end_time': end_time})
-        print(f"Fetched {len(df)} records for monitoring.")
-        return df, start_time, end_time
-    except exc.OperationalError as e:
-        print(f"Database Operational Error: {e}")
-        return pd.DataFrame(), start_time, end_time
+            WHERE prediction_time BETWEEN '{start_time.isoformat()}' AND '{end_time.isoformat()}'
+            ORDER BY random()
+            LIMIT {MONITORING_SAMPLE_SIZE}
+        """
+        df = cx.read_sql(SQLALCHEMY_DATABASE_URL, query, return_type="pandas")
+        rows_total = int(df['rows_total'].iloc[0]) if not df.empty else 0
+        df = df.drop(columns=['rows_total'])
+        print(f"Fetched {len(df)} of {rows_total} records for monitoring.")
+        return df, rows_total, start_time, end_time
     except Exception as e:
-        print(f"Unexpected error: {e}")
-        return pd.DataFrame(), start_time, end_time
-
-def run_evidently_report(reference_data: pd.DataFrame, current_data: pd.DataFrame):
-    """Generates an Evidently Data Drift Report between reference and current data."""
-    # Ensure both datasets share the same essential feature columns
-    required_features = ['feature_1', 'feature_2']
-    for column_name in required_features:
-        if column_name not in reference_data.columns:
-            reference_data[column_name] = pd.NA
-        if column_name not in current_data.columns:
-            current_data[column_name] = pd.NA
-
-    # Exclude prediction column from drift analysis to avoid mixed/empty columns
-    for df in (reference_data, current_data):
-        if 'prediction' in df.columns:
-            df.drop(columns=['prediction'], inplace=True)
-
+        # connectorx surfaces connection and query failures as its own RuntimeErrors
+        print(f"Failed to fetch production data: {e}")
+        return pd.DataFrame(), 0, start_time, end_time
+
+@functools.lru_cache(maxsize=1)
+def load_reference_data() -> pd.DataFrame:
+    """Loads the reference set once per process, preferring the Parquet copy."""
+    if os.path.exists(REFERENCE_PARQUET_PATH):
+        return pd.read_parquet(REFERENCE_PARQUET_PATH)
+    return pd.read_csv(REFERENCE_DATA_PATH)
+
+@functools.lru_cache(maxsize=1)
+def get_column_mapping() -> ColumnMapping:
+    """Builds the column mapping shared by every report run."""
     column_mapping = ColumnMapping()
     column_mapping.numerical_features = ['feature_1', 'feature_2']
     column_mapping.prediction = None
     column_mapping.target = None
+    return column_mapping
+
+def run_evidently_report(reference_data: pd.DataFrame, current_data: pd.DataFrame):
+    """Generates an Evidently Data Drift Report between reference and current data."""
+    # Restrict both datasets to the same essential feature columns (missing ones
+    # become NA). reindex returns new frames, so the caller's data is left intact.
+    required_features = ['feature_1', 'feature_2']
+    reference_data = reference_data.reindex(columns=required_features)
+    current_data = current_data.reindex(columns=required_features)
 
+    # Built per call: Report.run() keeps appending to its metric list and each metric
+    # holds on to the first run's context, so a reused Report returns stale results.
     report = Report(metrics=[DataDriftPreset(), DataQualityPreset()])
     print("Generating Evidently Report...")
-    report.run(reference_data=reference_data, current_data=current_data, column_mapping=column_mapping)
+    report.run(reference_data=reference_data, current_data=current_data, column_mapping=get_column_mapping())
     print("Evidently Report generated.")
     return report.as_dict()
 
-def process_and_log_metrics(db: Session, report_dict: dict, start_time: datetime, end_time: datetime):
+def process_and_log_metrics(db: Session, report_dict: dict, rows_total: int, start_time: datetime, end_time: datetime):
     """Extracts key metrics from the Evidently report and logs them to the DB."""
     drift_metric = report_dict['metrics'][0]['result']
     # Evidently returns dataset_drift as a boolean; convert to float for DB
@@ -83,8 +113,7 @@ def process_and_log_metrics(db: Session, report_dict: dict, start_time: datetime
 
     print(f"Drift Summary: Dataset Drift={data_drift_score}, Drifted Features={num_drifted_features}")
 
-    drift_log = MonitoringMetric(
-        timestamp=datetime.now(),
+    drift_log = dict(
         data_drift_score=data_drift_score,
         num_drifted_features=num_drifted_features,
         metric_name="data_drift_summary",
@@ -95,12 +124,11 @@ def process_and_log_metrics(db: Session, report_dict: dict, start_time: datetime
         batch_end_time=end_time
     )
 
-    count_log = MonitoringMetric(
-        timestamp=datetime.now(),
+    count_log = dict(
         data_drift_score=0.0,
         num_drifted_features=0,
         metric_name="prediction_count",
-        metric_value=float(rows_count),
+        metric_value=float(rows_total),
         report_summary=None,
         model_version=MODEL_VERSION,
         batch_start_time=start_time,
@@ -108,7 +136,8 @@ def process_and_log_metrics(db: Session, report_dict: dict, start_time: datetime
     )
 
     try:
-        db.add_all([drift_log, count_log])
+        # Core executemany INSERT; skips the ORM unit-of-work bookkeeping
+        db.execute(insert(MonitoringMetric), [drift_log, count_log])
         db.commit()
         print("Successfully logged 2 metrics to 'monitoring_metrics'.")
     except Exception as e:
@@ -132,8 +161,11 @@ def send_slack_alert(text: str) -> None:
         "icon_emoji": ":warning:",
         "text": text,
     }
+    alert_executor.submit(post_slack_payload, payload)
+
+def post_slack_payload(payload: dict) -> None:
     try:
-        response = requests.post(SLACK_WEBHOOK_URL, json=payload, timeout=5)
+        response = requests.post(SLACK_WEBHOOK_URL, json=payload, timeout=2)
         if response.ok:
             print("Slack alert sent.")
         else:
@@ -156,17 +188,17 @@ def main_monitoring_job():
     print("--- Starting Evidently Batch Monitoring Job ---")
 
     # 1. Load Reference Data
-    if not os.path.exists(REFERENCE_DATA_PATH):
+    if not os.path.exists(REFERENCE_DATA_PATH) and not os.path.exists(REFERENCE_PARQUET_PATH):
         print(f"Reference data not found at {REFERENCE_DATA_PATH}. Please run model_prep.py first.")
         return
 
-    reference_data = pd.read_csv(REFERENCE_DATA_PATH)
+    reference_data = load_reference_data()
     print(f"Reference data loaded: {len(reference_data)} rows.")
 
     # 2. Setup DB session and fetch current data
     db = SessionLocal()
     try:
-        current_data, start_time, end_time = fetch_data_from_db(db, lookback_hours=BATCH_HOURS)
+        current_data, rows_total, start_time, end_time = fetch_data_from_db(lookback_hours=BATCH_HOURS)
         if current_data.empty:
             print("No new data found in the batch window. Skipping report generation.")
             return
@@ -175,7 +207,7 @@ def main_monitoring_job():
         report_data = run_evidently_report(reference_data, current_data)
 
         # 4. Process and Log Metrics
-        process_and_log_metrics(db, report_data, start_time, end_time)
+        process_and_log_metrics(db, report_data, rows_total, start_time, end_time)
     finally:
         db.close()
         print("--- Monitoring Job Finished ---")
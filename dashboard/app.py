@@ -2,10 +2,8 @@ import os
 import requests
 import streamlit as st
 import pandas as pd
+import connectorx as cx
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, func, Text
-from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.sql import text
 
 # --- 1. Configuration and Database Setup (Replicated from API/Data Feeder) ---
 
@@ -24,53 +22,20 @@ if not API_HOST.startswith("http://") and not API_HOST.startswith("https://"):
 else:
     API_URL = API_HOST
 
-# PostgreSQL connection URL
+# PostgreSQL connection URL (read through connectorx)
 SQLALCHEMY_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# SQLAlchemy setup
-engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-
-# --- 2. Database Models (Needed to query the data) ---
-
-class PredictionLog(Base):
-    """Reflects the prediction_logs table."""
-    __tablename__ = "prediction_logs"
-    id = Column(Integer, primary_key=True)
-    feature_1 = Column(Float)
-    feature_2 = Column(Float)
-    prediction = Column(Integer)
-    target = Column(Integer, nullable=True) 
-    prediction_time = Column(DateTime)
-    model_version = Column(String(50))
-
-class MonitoringMetric(Base):
-    """Reflects the monitoring_metrics table."""
-    __tablename__ = "monitoring_metrics"
-    id = Column(Integer, primary_key=True)
-    timestamp = Column(DateTime)
-    data_drift_score = Column(Float)
-    num_drifted_features = Column(Integer)
-    metric_name = Column(String(100))
-    metric_value = Column(Float)
-    report_summary = Column(Text)
-    model_version = Column(String(50))
-    batch_start_time = Column(DateTime)
-    batch_end_time = Column(DateTime)
-
-
-# --- 3. Data Interaction Functions ---
+
+# --- 2. Data Interaction Functions ---
 
 @st.cache_data(ttl=5) # Cache data for 5 seconds for fast reloads
 def fetch_prediction_history(limit=100):
     """Fetches the latest prediction logs."""
     try:
-        df = pd.read_sql(
-            text(f"SELECT * FROM prediction_logs ORDER BY prediction_time DESC LIMIT :limit_val"), 
-            engine,
-            params={'limit_val': limit}
+        df = cx.read_sql(
+            SQLALCHEMY_DATABASE_URL,
+            f"SELECT * FROM prediction_logs ORDER BY prediction_time DESC LIMIT {int(limit)}",
+            return_type="pandas"
         )
         return df
     except Exception as e:
@@ -78,12 +43,15 @@ def fetch_prediction_history(limit=100):
         return pd.DataFrame()
 
 @st.cache_data(ttl=60) # Cache monitoring metrics for 60 seconds
-def fetch_monitoring_metrics():
-    """Fetches the latest monitoring metrics."""
+def fetch_monitoring_metrics(metric_name: str, limit: int = 100):
+    """Fetches the latest rows of a single monitoring metric, newest first."""
     try:
-        df = pd.read_sql(
-            text("SELECT * FROM monitoring_metrics ORDER BY timestamp DESC"), 
-            engine
+        # metric_name is always one of the dashboard's own constants, never user input
+        df = cx.read_sql(
+            SQLALCHEMY_DATABASE_URL,
+            f"SELECT * FROM monitoring_metrics WHERE metric_name = '{metric_name}' "
+            f"ORDER BY timestamp DESC LIMIT {int(limit)}",
+            return_type="pandas"
         )
         return df
     except Exception as e:
@@ -104,7 +72,7 @@ def get_prediction(feature_1: float, feature_2: float):
         st.error(f"API Error: Could not connect to {API_URL}. Is the 'api' service running? Details: {e}")
         return None
 
-# --- 4. Streamlit UI Layout ---
+# --- 3. Streamlit UI Layout ---
 
 def main():
     """Main function to run the Streamlit application."""
@@ -141,11 +109,12 @@ def main():
     # --- Monitoring Dashboard Section (col2 - Top Right) ---
     with col2:
         st.header("Model Health and Data Drift")
-        metrics_df = fetch_monitoring_metrics()
+        drift_df = fetch_monitoring_metrics('data_drift_summary', limit=100)
+        count_df = fetch_monitoring_metrics('prediction_count', limit=1)
         
-        if not metrics_df.empty:
-            latest_drift = metrics_df[metrics_df['metric_name'] == 'data_drift_summary'].iloc[0]
-            latest_count = metrics_df[metrics_df['metric_name'] == 'prediction_count'].iloc[0]
+        if not drift_df.empty and not count_df.empty:
+            latest_drift = drift_df.iloc[0]
+            latest_count = count_df.iloc[0]
             
             # Display Key Metrics
             col2_a, col2_b, col2_c = st.columns(3)
@@ -172,12 +141,13 @@ def main():
             
             # Display Drift History Chart
             st.subheader("Data Drift Score History")
-            drift_history = metrics_df[metrics_df['metric_name'] == 'data_drift_summary'].sort_values('timestamp', ascending=True)
+            drift_history = drift_df.sort_values('timestamp', ascending=True)
             drift_history = drift_history.rename(columns={'timestamp': 'Run Time', 'data_drift_score': 'Drift Score'})
             st.line_chart(drift_history, x='Run Time', y='Drift Score')
 
             # Detailed metrics table
-            with st.expander("View All Monitoring Metrics"):
+            with st.expander("View Recent Monitoring Metrics"):
+                metrics_df = pd.concat([count_df, drift_df], ignore_index=True)
                 st.dataframe(metrics_df[['timestamp', 'metric_name', 'metric_value', 'data_drift_score', 'num_drifted_features', 'model_version']], use_container_width=True)
         else:
             st.info("No monitoring metrics available yet. Run the `monitoring_job.py` script once the API has logs.")
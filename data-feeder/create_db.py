@@ -1,5 +1,5 @@
 import time
-from sqlalchemy import exc
+from sqlalchemy import exc, text
 from db_models import engine, Base
 
 MAX_RETRIES = 10
@@ -19,6 +19,27 @@ def create_database_tables():
             # This action attempts a connection immediately
             # Base.metadata.create_all attempts to connect and create tables if they don't exist
             Base.metadata.create_all(bind=engine)
+
+            # Lets the monitoring job's time-window query use an index range scan
+            # instead of a sequential scan over the whole log table. PostgreSQL also
+            # scans it backwards for the dashboard's newest-first history.
+            with engine.begin() as conn:
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_pred_time ON prediction_logs (prediction_time)"
+                ))
+                # Serves the dashboard's latest-rows-per-metric lookups
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_mm_name_ts "
+                    "ON monitoring_metrics (metric_name, timestamp DESC)"
+                ))
+                # Timestamps are filled in by the database; tables created before the
+                # server-side defaults existed need them added explicitly.
+                conn.execute(text(
+                    "ALTER TABLE prediction_logs ALTER COLUMN prediction_time SET DEFAULT now()"
+                ))
+                conn.execute(text(
+                    "ALTER TABLE monitoring_metrics ALTER COLUMN timestamp SET DEFAULT now()"
+                ))
             
             print("\n Database connection successful and tables created or already exist.")
             print("Tables created: prediction_logs, monitoring_metrics")
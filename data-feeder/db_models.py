@@ -42,7 +42,7 @@ class PredictionLog(Base):
     target = Column(Integer, nullable=True) 
     
     # Metadata
-    prediction_time = Column(DateTime, default=func.now())
+    prediction_time = Column(DateTime, server_default=func.now())
     model_version = Column(String(50), default="v1.0")
 
 class MonitoringMetric(Base):
@@ -55,7 +55,7 @@ class MonitoringMetric(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # The time the batch job ran
-    timestamp = Column(DateTime, default=func.now())
+    timestamp = Column(DateTime, server_default=func.now())
     
     # Metrics from the Evidently Data Drift Report (simplified)
     data_drift_score = Column(Float, nullable=False) # e.g., a custom combined drift score
@@ -1,6 +1,7 @@
-import requests
+import asyncio
+import httpx
 import time
-import random
+import numpy as np
 import os
 
 # --- Configuration ---
@@ -22,48 +23,48 @@ def generate_production_data(num_records):
     """
     Generates mock production data.
     """
-    mock_data = []
-    for _ in range(num_records):
-        # Generate features slightly different from the training data for realism
-        feature_1 = round(random.uniform(5.0, 15.0), 3)
-        feature_2 = round(random.uniform(10.0, 30.0), 3)
-        mock_data.append({
-            "feature_1": feature_1,
-            "feature_2": feature_2
-        })
+    rng = np.random.default_rng()
+    # Generate features slightly different from the training data for realism
+    feature_1 = rng.uniform(5.0, 15.0, num_records).round(3)
+    feature_2 = rng.uniform(10.0, 30.0, num_records).round(3)
+    mock_data = [
+        {"feature_1": f1, "feature_2": f2}
+        for f1, f2 in zip(feature_1.tolist(), feature_2.tolist())
+    ]
     return mock_data
 
-def send_batch_to_api(batch):
-    """Sends a batch of records to the FastAPI /predict endpoint."""
+async def send_batch_to_api(client, batch):
+    """Sends a batch of records to the FastAPI /predict endpoint concurrently."""
     success_count = 0
     failure_count = 0
-    
-    for record in batch:
-        try:
-            # We don't need exponential backoff here since the run will be manually triggered
-            # after all services are up, but we use a reasonable timeout.
-            response = requests.post(PREDICT_ENDPOINT, json=record, timeout=5)
-            
-            if response.status_code == 200:
-                success_count += 1
-            else:
-                failure_count += 1
-                print(f"  [ERROR] API responded with status {response.status_code}: {response.text}")
-                
-        except requests.exceptions.ConnectionError:
+
+    # All requests share the client's pooled keep-alive connections, so the batch
+    # pays for connection setup at most once instead of once per record.
+    responses = await asyncio.gather(
+        *(client.post("/predict", json=record, timeout=5) for record in batch),
+        return_exceptions=True
+    )
+
+    for response in responses:
+        if isinstance(response, httpx.ConnectError):
             failure_count += 1
             print(f"  [ERROR] Connection failed. Is the API service running at {API_URL}?")
-        except requests.exceptions.Timeout:
+        elif isinstance(response, httpx.TimeoutException):
             failure_count += 1
             print(f"  [ERROR] Request timed out.")
-        except Exception as e:
+        elif isinstance(response, Exception):
             failure_count += 1
-            print(f"  [ERROR] An unexpected error occurred: {e}")
+            print(f"  [ERROR] An unexpected error occurred: {response}")
+        elif response.status_code == 200:
+            success_count += 1
+        else:
+            failure_count += 1
+            print(f"  [ERROR] API responded with status {response.status_code}: {response.text}")
 
     return success_count, failure_count
 
 
-def simulate_production_traffic():
+async def simulate_production_traffic():
     """Simulates sending a large volume of data in batches."""
     print(f"--- Starting Production Data Simulation ---")
     print(f"Target API Endpoint: {PREDICT_ENDPOINT}")
@@ -73,19 +74,21 @@ def simulate_production_traffic():
     total_successful = 0
     total_failed = 0
     
-    for i in range(0, NUM_RECORDS_TO_SEND, BATCH_SIZE):
-        batch = all_data[i:i + BATCH_SIZE]
-        batch_num = (i // BATCH_SIZE) + 1
-        
-        print(f"\nSending Batch {batch_num} ({len(batch)} records)...")
-        
-        success, failure = send_batch_to_api(batch)
-        total_successful += success
-        total_failed += failure
-        
-        if i + BATCH_SIZE < NUM_RECORDS_TO_SEND:
-            print(f"Waiting {DELAY_PER_BATCH} second(s) before next batch...")
-            time.sleep(DELAY_PER_BATCH)
+    limits = httpx.Limits(max_keepalive_connections=64)
+    async with httpx.AsyncClient(base_url=API_URL, limits=limits) as client:
+        for i in range(0, NUM_RECORDS_TO_SEND, BATCH_SIZE):
+            batch = all_data[i:i + BATCH_SIZE]
+            batch_num = (i // BATCH_SIZE) + 1
+            
+            print(f"\nSending Batch {batch_num} ({len(batch)} records)...")
+            
+            success, failure = await send_batch_to_api(client, batch)
+            total_successful += success
+            total_failed += failure
+            
+            if i + BATCH_SIZE < NUM_RECORDS_TO_SEND:
+                print(f"Waiting {DELAY_PER_BATCH} second(s) before next batch...")
+                await asyncio.sleep(DELAY_PER_BATCH)
 
     print("\n--- Simulation Complete ---")
     print(f"Total Successful Logs: {total_successful}")
@@ -102,4 +105,4 @@ if __name__ == '__main__':
     print("Waiting 10 seconds for API service to stabilize before feeding data...")
     time.sleep(10) 
     
-    simulate_production_traffic()
+    asyncio.run(simulate_production_traffic())
@@ -10,6 +10,7 @@ from sklearn.model_selection import train_test_split
 DATA_DIR = os.path.join(os.getcwd(), 'data')
 MODEL_PATH = os.path.join(DATA_DIR, 'model.joblib')
 REFERENCE_DATA_PATH = os.path.join(DATA_DIR, 'reference_data.csv')
+REFERENCE_PARQUET_PATH = os.path.join(DATA_DIR, 'reference_data.parquet')
 
 # Ensure the data directory exists (this now reliably creates the mapped folder)
 os.makedirs(DATA_DIR, exist_ok=True)
@@ -17,12 +18,13 @@ os.makedirs(DATA_DIR, exist_ok=True)
 def generate_dummy_data(n_samples=5000):
     """Generates a dummy dataset for a binary classification problem."""
     # Create two features with some correlation
-    np.random.seed(42)
-    feature_1 = np.random.rand(n_samples) * 10
-    feature_2 = 2 * feature_1 + np.random.randn(n_samples) * 5
+    rng = np.random.default_rng(42)
+    feature_1 = rng.random(n_samples) * 10
+    feature_2 = 2 * feature_1 + rng.standard_normal(n_samples) * 5
     
     # Create a target variable based on a simple rule with noise
-    target = (feature_1 * 0.5 + feature_2 * 0.1 + feature_2 * 0.1 + np.random.randn(n_samples) * 2 > 4.5).astype(int)
+    logits = 0.5 * feature_1 + 0.2 * feature_2 + rng.standard_normal(n_samples) * 2
+    target = (logits > 4.5).astype(np.int8)
     
     data = pd.DataFrame({
         'feature_1': feature_1,
@@ -35,16 +37,18 @@ def train_and_save_model(data):
     """Trains a simple Logistic Regression model and saves it."""
     print("Training dummy model...")
     
-    # Use all data for the 'training' set to ensure model is functional
-    X = data[['feature_1', 'feature_2']]
-    y = data['target']
+    # Use all data for the 'training' set to ensure model is functional.
+    # Fit on plain arrays so the API can score raw float arrays without
+    # sklearn's DataFrame/feature-name validation.
+    X = np.column_stack([data['feature_1'].to_numpy(), data['feature_2'].to_numpy()])
+    y = data['target'].to_numpy()
     
     # Train model
-    model = LogisticRegression(random_state=42)
+    model = LogisticRegression(random_state=42, solver='lbfgs', max_iter=200)
     model.fit(X, y)
     
-    # Save model
-    joblib.dump(model, MODEL_PATH)
+    # Save model (compressed to cut the API's load time from the shared volume)
+    joblib.dump(model, MODEL_PATH, compress=3)
     print(f"Dummy model saved to: {MODEL_PATH}")
 
 def save_reference_data(data):
@@ -54,7 +58,9 @@ def save_reference_data(data):
     
     # Ensure 'target' column is present for performance reporting later
     reference_data.to_csv(REFERENCE_DATA_PATH, index=False)
-    print(f"Reference data saved to: {REFERENCE_DATA_PATH}")
+    # Compact columnar copy; the monitoring job loads this in preference to the CSV
+    reference_data.to_parquet(REFERENCE_PARQUET_PATH, index=False, compression='zstd')
+    print(f"Reference data saved to: {REFERENCE_DATA_PATH} and {REFERENCE_PARQUET_PATH}")
 
 if __name__ == '__main__':
     full_data = generate_dummy_data()
@@ -65,4 +71,4 @@ if __name__ == '__main__':
     # 2. Save the reference data for the monitoring service
     save_reference_data(full_data)
     
-    print("\nModel preparation complete. The 'data' folder now contains 'model.joblib' and 'reference_data.csv'.")
+    print("\nModel preparation complete. The 'data' folder now contains 'model.joblib' and 'reference_data.csv/.parquet'.")